@@ -1,24 +1,40 @@
 import matplotlib
 matplotlib.use('Agg')
+import atexit
 import logging
+import logging.handlers
+import queue
 
 # Configure logging
 name = 'daq'
 fmt = '%(asctime)s\t%(name)-20s%(levelname)s\t%(message)s'
 datefmt = '%m/%d/%Y %I:%M:%S %p'
 formatter = logging.Formatter(fmt,datefmt)
-logging.basicConfig(filename='{0}.log'.format(name), filemode='w', level=10, format=fmt, datefmt=datefmt)
 logger = logging.getLogger(name)
+# Add log file for all loggers, buffered until a warning or a full buffer
+file_handler = logging.FileHandler('{0}.log'.format(name), mode='w')
+file_handler.setFormatter(formatter)
+file_handler.setLevel(logging.DEBUG)
+memory_handler = logging.handlers.MemoryHandler(capacity=1024, flushLevel=logging.WARNING, target=file_handler)
+memory_handler.setLevel(logging.DEBUG)
 # Add console output
 stream_handler = logging.StreamHandler()
 stream_handler.setFormatter(formatter)
 stream_handler.setLevel(logging.INFO)
-logger.addHandler(stream_handler)
+stream_handler.addFilter(logging.Filter(name))
 # Add error log
 err_handler = logging.FileHandler('{0}.err'.format(name), mode='w')
 err_handler.setFormatter(formatter)
 err_handler.setLevel(logging.WARNING)
-logger.addHandler(err_handler)
+err_handler.addFilter(logging.Filter(name))
+# Hand records to a background thread for output
+log_queue = queue.Queue(-1)
+logging.root.setLevel(logging.DEBUG)
+logging.root.addHandler(logging.handlers.QueueHandler(log_queue))
+listener = logging.handlers.QueueListener(log_queue, memory_handler, stream_handler, err_handler, respect_handler_level=True)
+listener.start()
+atexit.register(memory_handler.close)
+atexit.register(listener.stop)
 # Supress other logging
 logging.getLogger('urllib3').setLevel(logging.CRITICAL)
 logging.getLogger('suds').setLevel(logging.CRITICAL)
@@ -1,16 +1,83 @@
+from concurrent.futures import ThreadPoolExecutor
 import csv
+import functools
+import operator
 import os
-import stat
+import re
+from time import monotonic
 
 from influxdb import DataFrameClient, InfluxDBClient
+from influxdb.resultset import ResultSet
+import numpy as np
 import pandas as pd
 import logging
 
 logger = logging.getLogger('daq.{0}'.format(__name__))
 
+# Translation table to make names compatible with influxdb measurement names
+_COMPAT_TABLE = str.maketrans({'-':'_', '#':'', '/':'_', ' ':'_'})
+# Names of forecast fields holding values, the others are metadata
+_FCST_IDX_RE = re.compile(r'^\d+$')
+# Database objects created by setup_lbnl, keyed by connection and style
+_DATABASES = {}
+# Seconds for which a list of measurements is reused
+_MEASUREMENTS_TTL = 60
+
+def _escape_measurement(key):
+    '''Escape a measurement name for influxdb line protocol.
+
+    '''
+
+    return key.replace('\\', '\\\\').replace(',', '\\,').replace(' ', '\\ ').replace('\n', '\\n')
+
+def _escape_field(key):
+    '''Escape a field key for influxdb line protocol.
+
+    '''
+
+    return _escape_measurement(key).replace('=', '\\=')
+
+def _format_value(value):
+    '''Format a field value for influxdb line protocol.
+
+    Python integers are suffixed by ``i`` while numpy integers are written
+    as floats, as the influxdb client does.  Strings are quoted and escaped,
+    and booleans are written as ``true`` or ``false``.
+
+    '''
+
+    if isinstance(value, (bool, np.bool_)):
+        return 'true' if value else 'false'
+    if isinstance(value, int):
+        return '{0}i'.format(value)
+    if isinstance(value, (float, np.floating, np.integer)):
+        return repr(float(value))
+    return '"{0}"'.format(str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+
+@functools.lru_cache(maxsize=1024)
+def _to_rfc3339(time):
+    '''Convert a time in UTC to the rfc3339 string used in queries.
+
+    '''
+
+    return pd.Timestamp(time, tz='UTC').strftime('%Y-%m-%d %H:%M:%S')
+
+def _make_line(measurement, fields, time_ns):
+    '''Build an influxdb line protocol record.
+
+    Fields with value None or NaN are left out.
+
+    '''
+
+    values = ','.join('{0}={1}'.format(_escape_field(k), _format_value(v)) for k, v in fields.items() if not pd.isna(v))
+    return '{0} {1} {2}'.format(_escape_measurement(measurement), values, time_ns)
+
+@functools.lru_cache(maxsize=None)
 def get_access(source):
     '''Get access to data source.
 
+    Results are cached so the access file is read once per data source.
+
     Parameters
     ----------
     source : string
@@ -18,31 +85,34 @@ def get_access(source):
 
     Returns
     -------
-    args : list
-        Line of access file corresponding to data source name.
+    user_name : string
+        User name for data source.
+    password : string
+        Password for data source.
 
     '''
     # Get local directory
     path = os.path.dirname(os.path.abspath(__file__))
+    # Encode source name as stored in access file
+    source_hex = source.encode('utf-8').hex()
     # Get access data
     try:
-        # Check permissions
-        # Python2: &0777, In Ubuntu version, is '0600', was revised to '0666' in the windows version
-        # Python3: &777, '0o400'
-        if oct(os.stat(path+'/access.config')[stat.ST_MODE] & 777) != '0o400':
+        # Check permissions, access file must be readable by owner and not executable
+        # Ubuntu setups use '0400' or '0600', the windows version reports '0666' or '0444'
+        mode = os.stat(path+'/access.config').st_mode
+        if not (mode & 0o400) or (mode & 0o111):
             print('Accessing file with wrong permissions.')
             raise IOError
         # Open access file
         with open(path+'/access.config', 'r') as f:
             reader = csv.reader(f)
-            # Search for correct line
+            # Search for correct line, only decoding the match
             for line in reader:
-                # Assign args
-                if bytes.fromhex(line[0]).decode('utf-8') == source:
+                if line[0].lower() == source_hex:
                     args = line
                     break
-                else:
-                    args = None
+            else:
+                args = None
     # Handle errors
     except IOError:
         raise IOError('Access file not found or has incorrect permissions.  Access denied.')
@@ -57,6 +127,8 @@ def get_access(source):
 def setup_lbnl(databaseName='building59', style=None):
     '''Setup the connection to the LBNL-hosted database holding demo data.
 
+    Database objects are reused across calls with the same connection and style.
+
     Parameters
     ----------
     databaseName : str
@@ -98,15 +170,17 @@ def setup_lbnl(databaseName='building59', style=None):
     else:
         raise NameError('Database not found')
 
-    # Initialize database
-    if style is None:
-        db = database(host, port, 'dhblum', username, password, ssl=True, verify_ssl=True)
-    elif style is 'forecasts':
-        db = database_forecast(host, port, 'dhblum', username, password, ssl=True, verify_ssl=True)
-    elif style is 'generic':
-        db = database_generic(host, port, 'dhblum', username, password, ssl=True, verify_ssl=True)
-    else:
+    # Get database interface
+    cls = _STYLE_DISPATCH.get(style)
+    if cls is None:
         raise ValueError('Unknown database interface style {0}.'.format(style))
+    # Reuse database if already initialized
+    db_key = (host, port, 'dhblum', username, style)
+    if db_key in _DATABASES:
+        return _DATABASES[db_key], dbname
+    # Initialize database
+    db = cls(host, port, 'dhblum', username, password, ssl=True, verify_ssl=True)
+    _DATABASES[db_key] = db
 
     #print(username, password)
     return db, dbname
@@ -145,6 +219,7 @@ class database(object):
 
         # Create client
         self.client = DataFrameClient(host, port, user, password, database=dbname, ssl=ssl, verify_ssl=verify_ssl)
+        self._measurements_cache = {}
 
     def create_database(self, dbname):
         '''Create new database.
@@ -163,15 +238,8 @@ class database(object):
         '''
 
         # Check if database exists and create if not
-        db_list = self.client.get_list_database()
-        exist = 0
-        for db in db_list:
-            if dbname in db['name']:
-                exist = 1
-                break
-            else:
-                exist = 0
-        if exist:
+        existing = {db['name'] for db in self.client.get_list_database()}
+        if dbname in existing:
             logger.info('Database {0} found already.'.format(dbname))
             flag = -1
         else:
@@ -193,7 +261,8 @@ class database(object):
         compatible_names : boolean, default True
             Mark True to convert dataframe column names to be compatible with
             influxdb measurement names as follows:
-            ``name.replace('-','_').replace('#','').replace('/','_')``.
+            ``name.translate(_COMPAT_TABLE)``, i.e. '-', '/' and ' ' become '_'
+            and '#' is removed.
 
         Returns
         -------
@@ -207,20 +276,38 @@ class database(object):
         flag = 1
         # Convert keys to influxdb compatible if requested
         if compatible_names:
-            columns = {};
-            for key in df.columns.values:
-                columns[key] = key.replace('-','_').replace('#','').replace('/','_').replace(' ', '_')
-            df.rename(columns=columns, inplace=True)
-        # Store data
-        for key in df.columns.values:
-            try:
-                self.client.write_points(df[key].to_frame().dropna(), key, database=dbname)
-                logger.info('Data for {0} written to database {1}.'.format(key,dbname))
-                if flag == -1:
-                    flag = -1
-            except TypeError:
+            df.rename(columns=lambda c: c.translate(_COMPAT_TABLE), inplace=True)
+        # Timestamps in nanoseconds, naive index is taken as UTC
+        times = pd.DatetimeIndex(df.index).as_unit('ns').asi8
+        # Build line protocol for every column, measurement and field share key
+        notna = df.notna().values
+        lines = []
+        keys = []
+        for j, key in enumerate(df.columns.values):
+            # Integer columns are stored as integers, as DataFrameClient does
+            if pd.api.types.is_integer_dtype(df.dtypes.iloc[j]):
+                values = np.array(df.iloc[:, j].tolist(), dtype=object)
+            else:
+                values = df.iloc[:, j].to_numpy()
+            mask = notna[:, j]
+            if not mask.any():
                 logger.warning('{0} not able to be stored in database.  Contains all NaN.'.format(key))
                 flag = -1
+                continue
+            # Skip masking columns without NaN
+            if mask.all():
+                column_times = times
+            else:
+                values = values[mask]
+                column_times = times[mask]
+            prefix = '{0} {1}='.format(_escape_measurement(key), _escape_field(key))
+            lines.extend(['{0}{1} {2}'.format(prefix, _format_value(v), t) for v, t in zip(values, column_times)])
+            keys.append(key)
+        # Store data in batched requests
+        if lines:
+            InfluxDBClient.write_points(self.client, lines, database=dbname, protocol='line', batch_size=5000)
+            self._measurements_cache.clear()
+            logger.info('Data for {0} written to database {1}.'.format(keys,dbname))
 
         return flag
 
@@ -240,7 +327,8 @@ class database(object):
         compatible_names : boolean, default True
             Mark True to convert key to be compatible with
             influxdb measurement names as follows:
-            ``name.replace('-','_').replace('#','').replace('/','_')``.
+            ``name.translate(_COMPAT_TABLE)``, i.e. '-', '/' and ' ' become '_'
+            and '#' is removed.
             DataFrame column names will be returned as original key.
 
         Returns
@@ -251,23 +339,82 @@ class database(object):
         '''
 
         # Convert times to utc and rfc3339
-        start_time_db = pd.to_datetime(start_time).tz_localize('UTC').strftime('%Y-%m-%d %H:%M:%S');
-        final_time_db = pd.to_datetime(final_time).tz_localize('UTC').strftime('%Y-%m-%d %H:%M:%S');
+        start_time_db = _to_rfc3339(start_time)
+        final_time_db = _to_rfc3339(final_time)
+
+        return self._query_data(key, dbname, start_time_db, final_time_db, compatible_names)
+
+    def get_data_multi(self, keys, dbname, start_time, final_time, compatible_names=True, max_workers=8):
+        '''Get data for several measurements from database concurrently.
+
+        Parameters
+        ----------
+        keys : list of strings
+            Names of measurements to get data for.
+        dbname : string
+            Name of database to get data from.
+        start_time : string
+            Start time of data collection in UTC.
+        final_time : string
+            Final time of data collection in UTC.
+        compatible_names : boolean, default True
+            Mark True to convert keys to be compatible with
+            influxdb measurement names, see ``get_data``.
+            DataFrame column names will be returned as original keys.
+        max_workers : int, default 8
+            Maximum number of queries issued at the same time.
+
+        Returns
+        -------
+        df : pandas DataFrame
+            DataFrame with column names as keys and index as timestamp in UTC.
+            Keys without data are left out.  None is returned if no data found.
+
+        '''
+
+        # Convert times to utc and rfc3339
+        start_time_db = _to_rfc3339(start_time)
+        final_time_db = _to_rfc3339(final_time)
+        # Get data
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(lambda key: self._query_data(key, dbname, start_time_db, final_time_db, compatible_names), keys)
+            results = [df for df in results if df is not None]
+        if not results:
+            return None
+
+        return pd.concat(results, axis=1)
+
+    def _query_data(self, key, dbname, start_time_db, final_time_db, compatible_names):
+        '''Get data from database between rfc3339 times.
+
+        See ``get_data`` for parameters.
+
+        '''
+
         # Make compatible if requested
         if compatible_names:
             key_old = key;
-            key = key.replace('-','_').replace('#','').replace('/','_')
+            key = key.translate(_COMPAT_TABLE)
         # Get data
         query = "SELECT * FROM {0} WHERE time >= '{1}' AND time <= '{2}'".format(key, start_time_db, final_time_db)
-        res = self.client.query(query, database=dbname)
-        try:
-            df = res[key];
+        res = InfluxDBClient.query(self.client, query, database=dbname, chunked=True, chunk_size=10000)
+        # Chunks are streamed as result sets, older clients merge them into one
+        if isinstance(res, ResultSet):
+            res = [res]
+        parts = [pd.DataFrame(list(r.get_points(measurement=key))) for r in res]
+        parts = [part for part in parts if not part.empty]
+        if parts:
+            df = pd.concat(parts)
+            # Index by time in UTC and drop empty fields as DataFrameClient does
+            df = df.set_index(pd.to_datetime(df.pop('time'), utc=True))
+            df.index.name = None
+            df.dropna(how='all', axis=1, inplace=True)
             # Change key name back to non-compatible if requested
             if compatible_names:
                 columns = {key : key_old}
                 df.rename(columns=columns, inplace=True)
             logger.info('Data for {0} retrieved from database {1}.'.format(key,dbname))
-        except KeyError:
+        else:
             logger.warning('Data for {0} not found in database.  Check that the key and time interval are correct and that there is data during the time interval.'.format(key))
             df = None
 
@@ -285,25 +432,33 @@ class database(object):
         compatible_names : boolean, default True
             Mark True to convert key to be compatible with
             influxdb measurement names as follows:
-            ``name.replace('-','_').replace('#','').replace('/','_')``.
+            ``name.translate(_COMPAT_TABLE)``, i.e. '-', '/' and ' ' become '_'
+            and '#' is removed.
             DataFrame column names will be returned as original key.
 
         '''
 
         # Make compatible if requested
         if compatible_names:
-            key = key.replace('-','_').replace('#','').replace('/','_')
+            key = key.translate(_COMPAT_TABLE)
         # Drop measurement
         query = "DROP MEASUREMENT {0}".format(key)
         res = self.client.query(query, database=dbname)
+        self._measurements_cache.clear()
 
-    def get_measurements_list(self, dbname):
-        '''Get data from database.
+    def get_measurements_list(self, dbname, pattern=None):
+        '''Get list of measurements from database.
+
+        Lists are cached for ``_MEASUREMENTS_TTL`` seconds and the cache is
+        cleared when data is written or a measurement is dropped.
 
         Parameters
         ----------
         dbname : string
             Name of database from which to get list of measurements.
+        pattern : string, default None
+            Regular expression to filter measurement names on the server.
+            If None, all measurements are returned.
 
         Returns
         -------
@@ -312,15 +467,23 @@ class database(object):
 
         '''
 
+        # Check cache
+        cache_key = (dbname, pattern)
+        if cache_key in self._measurements_cache:
+            timestamp, measurements_list = self._measurements_cache[cache_key]
+            if monotonic() - timestamp < _MEASUREMENTS_TTL:
+                return list(measurements_list)
         # Get data
-        query = "SHOW MEASUREMENTS"
+        if pattern is None:
+            query = "SHOW MEASUREMENTS"
+        else:
+            query = "SHOW MEASUREMENTS WITH MEASUREMENT =~ /{0}/".format(pattern.replace('/', '\\/'))
         res = self.client.query(query, database=dbname)
         # Parse data into list
-        measurements_list = []
-        for d in res['measurements']:
-            measurements_list.append(d['name'])
+        measurements_list = [d['name'] for d in res.get_points()]
+        self._measurements_cache[cache_key] = (monotonic(), measurements_list)
 
-        return measurements_list
+        return list(measurements_list)
 
 class database_forecast(database):
     '''Class to facilitate writing and reading from influxdb database for forecasts.
@@ -358,6 +521,7 @@ class database_forecast(database):
 
         # Create client
         self.client = InfluxDBClient(host, port, user, password, database=dbname, ssl=ssl, verify_ssl=verify_ssl)
+        self._measurements_cache = {}
 
     def write_data(self, df, dbname, time = None, compatible_names=True):
         '''Write hourly forecast dataframe to database.
@@ -379,7 +543,8 @@ class database_forecast(database):
         compatible_names : boolean, default True
             Mark True to convert dataframe column names to be compatible with
             influxdb measurement names as follows:
-            ``name.replace('-','_').replace('#','').replace('/','_')``.
+            ``name.translate(_COMPAT_TABLE)``, i.e. '-', '/' and ' ' become '_'
+            and '#' is removed.
 
         '''
         import cleaning
@@ -396,23 +561,18 @@ class database_forecast(database):
             start_time = (df.index[0]-pd.Timedelta(seconds=likely_sample_rate)).strftime('%Y-%m-%d %H:%M:%S');
         # Convert keys to influxdb compatible if requested
         if compatible_names:
-            columns = {};
-            for key in df.columns.values:
-                columns[key] = key.replace('-','_').replace('#','').replace('/','_').replace(' ', '_')
-            df.rename(columns=columns, inplace=True)
-        # Build message
+            df.rename(columns=lambda c: c.translate(_COMPAT_TABLE), inplace=True)
+        # Build message in line protocol
+        time_ns = pd.Timestamp(time_db, tz='UTC').value
         message = []
         for key in df.columns.values:
-            json_body = {'measurement':key, 'time':time_db, 'fields':dict()}
-            i = 1
-            for value in df[key].values:
-                json_body['fields']['{0}'.format(i)] = value
-                i = i + 1
-            json_body['fields']['sample_rate'] = likely_sample_rate
-            json_body['fields']['start_time'] = start_time
-            message.append(json_body)
+            fields = {str(i) : v for i, v in enumerate(df[key].to_numpy(dtype=float).tolist(), 1)}
+            fields['sample_rate'] = likely_sample_rate
+            fields['start_time'] = start_time
+            message.append(_make_line(key, fields, time_ns))
         # Store data
-        self.client.write_points(message, database=dbname)
+        self.client.write_points(message, database=dbname, protocol='line', batch_size=5000)
+        self._measurements_cache.clear()
         logger.info('Data for {0} written to database {1}.'.format(df.columns.values,dbname))
 
     def get_data(self, key, dbname, time, compatible_names=True):
@@ -429,7 +589,8 @@ class database_forecast(database):
         compatible_names : boolean, default True
             Mark True to convert key to be compatible with
             influxdb measurement names as follows:
-            ``name.replace('-','_').replace('#','').replace('/','_')``.
+            ``name.translate(_COMPAT_TABLE)``, i.e. '-', '/' and ' ' become '_'
+            and '#' is removed.
             DataFrame column names will be returned as original key.
 
         Returns
@@ -441,42 +602,44 @@ class database_forecast(database):
         '''
 
         # Convert time to utc and rfc3339
-        time_db = pd.to_datetime(time).tz_localize('UTC').strftime('%Y-%m-%d %H:%M:%S');
+        time_db = _to_rfc3339(time)
         # Make compatible if requested
         if compatible_names:
             key_old = key;
-            key = key.replace('-','_').replace('#','').replace('/','_')
+            key = key.translate(_COMPAT_TABLE)
         # Get data
         query = "SELECT * FROM {0} WHERE time = '{1}'".format(key, time_db)
         res = self.client.query(query, database=dbname)
         logger.info('Data for {0} retrieved from database {1}.'.format(key, dbname))
         points = res.get_points()
-        # Convert to dataframe
-        df_points = pd.DataFrame(points).transpose()
-        if not df_points.empty:
-            df = pd.DataFrame()
-            try:
-                sample_rate = int(df_points.loc['sample_rate',0])
-            except KeyError:
+        # Take the forecast record
+        rec = next(iter(points), None)
+        if rec is not None:
+            if 'sample_rate' not in rec:
                 logger.info('sample_rate not found.  Using 3600 seconds.')
                 sample_rate = 3600
-            except TypeError:
+            elif rec['sample_rate'] is None:
                 logger.info('sample_rate found, but None.  Using 3600 seconds.')
                 sample_rate = 3600
-            try:
-                start_time = pd.to_datetime(df_points.loc['start_time',0])
-                if not start_time:
-                    logger.info('start_time found, but None. Using database measurement time.')
-                    start_time = pd.to_datetime(time)
-            except KeyError:
+            else:
+                sample_rate = int(rec['sample_rate'])
+            if 'start_time' not in rec:
                 logger.info('start_time not found. Using database measurement time.')
                 start_time = pd.to_datetime(time)
-            for i in df_points.index.values:
-                try:
-                    t = start_time+pd.Timedelta(seconds=float(i)*sample_rate)
-                    df.loc[t,key] = df_points.loc[i,0]
-                except:
-                    pass
+            elif not rec['start_time']:
+                logger.info('start_time found, but None. Using database measurement time.')
+                start_time = pd.to_datetime(time)
+            else:
+                start_time = pd.to_datetime(rec['start_time'])
+            # Forecast values are stored in fields named by their step number
+            keys = sorted((k for k in rec if _FCST_IDX_RE.match(k)), key=int)
+            idx = np.array([int(k) for k in keys], dtype=np.int64)
+            if len(keys) > 1:
+                vals = np.array(operator.itemgetter(*keys)(rec), dtype=np.float64)
+            else:
+                vals = np.array([rec[k] for k in keys], dtype=np.float64)
+            times = start_time + pd.to_timedelta(idx*sample_rate, unit='s')
+            df = pd.DataFrame({key : vals}, index=times)
             # Change key name back to non-compatible if requested
             if compatible_names:
                 columns = {key : key_old}
@@ -528,6 +691,7 @@ class database_generic(database):
 
         # Create client
         self.client = InfluxDBClient(host, port, user, password, database=dbname, ssl=ssl, verify_ssl=verify_ssl)
+        self._measurements_cache = {}
 
     def write_data(self, name, dbname, time, message):
         '''Write generic data to influexdb.
@@ -546,14 +710,12 @@ class database_generic(database):
         '''
 
         # Convert times to utc and rfc3339
-        time_db = pd.to_datetime(time).tz_localize('UTC').strftime('%Y-%m-%d %H:%M:%S');
-        # Build message
-        json_body = {'measurement':name, 'time':time_db, 'fields':dict()}
-        for field in message.keys():
-            json_body['fields'][field] = message[field]
+        time_db = _to_rfc3339(time)
+        # Build message in line protocol
+        line = _make_line(name, message, pd.Timestamp(time_db, tz='UTC').value)
         # Store data
-        json_body = [json_body]
-        self.client.write_points(json_body, database=dbname)
+        self.client.write_points([line], database=dbname, protocol='line')
+        self._measurements_cache.clear()
         logger.info('Data for {0} written to database {1}.'.format(name,dbname))
 
     def get_data(self, name, dbname, time):
@@ -576,25 +738,59 @@ class database_generic(database):
 
         '''
 
+        # Get data at a single time
+        df = self.get_data_range(name, dbname, time, time)
+        # Format data
+        if df is not None:
+            data = dict()
+            data['name'] = df.attrs['name']
+            data['time'] = df.index[0]
+            data.update(df.to_dict('records')[0])
+        else:
+            data = None
+
+        return data
+
+    def get_data_range(self, name, dbname, start_time, final_time):
+        '''Get generic data between two times from database.
+
+        Parameters
+        ----------
+        name : str
+            Name of measurement.
+        dbname: str
+            Name of database table to get data from.
+        start_time : str
+            Start time of data in UTC.
+        final_time : str
+            Final time of data in UTC.
+
+        Returns
+        -------
+        df : pandas DataFrame
+            DataFrame with fields as columns and index as time returned by
+            the database.  Series name returned by the database is stored
+            in ``df.attrs['name']``.  None is returned if no data found.
+
+        '''
+
         # Convert times to utc and rfc3339
-        time_db = pd.to_datetime(time).tz_localize('UTC').strftime('%Y-%m-%d %H:%M:%S');
+        start_time_db = _to_rfc3339(start_time)
+        final_time_db = _to_rfc3339(final_time)
         # Get data
-        query = "SELECT * FROM {0} WHERE time = '{1}'".format(name, time_db)
+        query = "SELECT * FROM {0} WHERE time >= '{1}' AND time <= '{2}'".format(name, start_time_db, final_time_db)
         res = self.client.query(query, database=dbname)
         # Check data exists
         if 'series' in res.raw.keys():
             logger.info('Data for {0} retrieved from database {1}.'.format(name, dbname))
             message = res.raw['series'][0]
-            # Format data
-            data = dict()
-            data['name'] = message['name']
-            for i,key in enumerate(message['columns']):
-                data[key] = message['values'][0][i]
+            df = pd.DataFrame(message['values'], columns=message['columns']).set_index('time')
+            df.attrs['name'] = message['name']
         else:
-            logger.warning('Could not find data for {0} at {1}.  Check that the key and time are correct and that data exists.'.format(name, time_db))
-            data = None
+            logger.warning('Could not find data for {0} between {1} and {2}.  Check that the key and times are correct and that data exists.'.format(name, start_time_db, final_time_db))
+            df = None
 
-        return data
+        return df
 
     def get_data_all_raw(self, key, dbname, compatible_names=True):
         '''Get data from database.()
@@ -608,7 +804,8 @@ class database_generic(database):
         compatible_names : boolean, default True
             Mark True to convert key to be compatible with
             influxdb measurement names as follows:
-            ``name.replace('-','_').replace('#','').replace('/','_')``.
+            ``name.translate(_COMPAT_TABLE)``, i.e. '-', '/' and ' ' become '_'
+            and '#' is removed.
             DataFrame column names will be returned as original key.
 
         Returns
@@ -619,9 +816,12 @@ class database_generic(database):
         # Make compatible if requested
         if compatible_names:
             key_old = key;
-            key = key.replace('-','_').replace('#','').replace('/','_')
+            key = key.translate(_COMPAT_TABLE)
         # Get data
         query = "SELECT * FROM {0}".format(key)
         res = self.client.query(query, database=dbname)
 
         return res
+
+# Database interface for each style of setup_lbnl
+_STYLE_DISPATCH = {None: database, 'forecasts': database_forecast, 'generic': database_generic}